@@ -0,0 +1,11 @@
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'artiselite_be.settings')
+
+app = Celery('artiselite_be')
+
+# All celery configuration lives in Django settings under the CELERY_ prefix.
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
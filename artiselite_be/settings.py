@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -47,9 +48,15 @@ INSTALLED_APPS = [
     'dashboard',
     'rest_framework_simplejwt',
     'auditlog',
+    'cacheops',
 ]
 
 MIDDLEWARE = [
+    # GZip must run first so it compresses the final response body; the
+    # conditional-get middleware right after lets polling clients get 304s
+    # from the ETags the list views set.
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -145,6 +152,17 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Argon2 is memory-hard and faster to verify at equivalent security than
+# the default PBKDF2 iteration counts; existing PBKDF2 hashes keep
+# verifying via the fallback entries and are re-hashed on next login.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
@@ -177,6 +195,38 @@ REST_FRAMEWORK = {
     )
 }
 
+# Batch size used by bulk_create/bulk_update flows (e.g. product bulk upload).
+# Tunable per deployment without a code change.
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 1000))
+
+# Celery
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+
+# When enabled, bulk uploads are persisted to storage and processed on the
+# 'inventory' Celery queue; the API answers 202 with a job id immediately
+# instead of holding the worker for the whole file.
+BULK_UPLOAD_ASYNC = os.environ.get('BULK_UPLOAD_ASYNC', 'False').lower() in ('true', '1')
+
+# Fan CSV chunks out across the inventory queue as a Celery group. Each
+# chunk commits in its own transaction, so a failed chunk no longer rolls
+# back the whole file; keep disabled where that guarantee matters.
+BULK_UPLOAD_PARALLEL = os.environ.get('BULK_UPLOAD_PARALLEL', 'False').lower() in ('true', '1')
+
+# Cacheops: serve repeated Product/Customer fetch queries (e.g. the IN
+# queries issued per bulk-upload chunk) from Redis, with event-driven
+# invalidation on save. Opt-in so environments without Redis are
+# unaffected; on Redis failure queries silently fall through to Postgres.
+# Note: raw SQL writes to these tables bypass invalidation — keep
+# inventory updates on the ORM.
+CACHEOPS_ENABLED = os.environ.get('CACHEOPS_ENABLED', 'False').lower() in ('true', '1')
+CACHEOPS_REDIS = os.environ.get('CACHEOPS_REDIS', 'redis://localhost:6379/1')
+CACHEOPS_DEGRADE_ON_FAILURE = True
+CACHEOPS = {
+    'inventory.product': {'ops': 'fetch', 'timeout': 600},
+    'outbound.customer': {'ops': 'fetch', 'timeout': 600},
+}
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
@@ -0,0 +1,8 @@
+def normalize_headers(headers):
+    """
+    Normalize uploaded column headers to snake_case.
+    A plain comprehension over the handful of header strings avoids the
+    pandas StringMethods chain, which reallocates the Index once per pass
+    and routes .str.replace through its regex engine.
+    """
+    return [str(c).strip().lower().replace(' ', '_') for c in headers]
@@ -3,6 +3,7 @@ import json
 import pandas as pd
 from django.db import transaction
 from django.http import QueryDict
+from core.utils import normalize_headers
 from inventory.models import Product
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
@@ -120,7 +121,7 @@ class InboundViewSet(AuditLogMixin, viewsets.ModelViewSet):
 
         try:
             df = pd.read_csv(file, dtype={'inbound_ref': str}) if file.name.endswith('.csv') else pd.read_excel(file, dtype={'inbound_ref': str})
-            df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
+            df.columns = normalize_headers(df.columns)
 
             # Validate required columns
             required_cols = {'inbound_ref', 'inbound_date', 'supplier_email', 'product_sku', 'quantity', 'unit_price'}
@@ -160,7 +161,9 @@ class InboundViewSet(AuditLogMixin, viewsets.ModelViewSet):
                         notes=f'Bulk upload ref: {ref}'
                     )
 
-                    for _, row in group.iterrows():
+                    # Plain dicts via to_dict('records') instead of a Series
+                    # per row from iterrows().
+                    for row in group.to_dict('records'):
                         product = Product.objects.get(sku=row['product_sku'])
                         InboundItem.objects.create(
                             inbound=inbound_shipment,
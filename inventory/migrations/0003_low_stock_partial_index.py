@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def add_low_stock_index(apps, schema_editor):
+    # Django cannot express F() inside an index condition, so the partial
+    # index is created with raw SQL. The predicate matches exactly what the
+    # low_stock endpoint filters on, so the index covers only the (usually
+    # tiny) fraction of rows that endpoint returns.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX idx_low_stock ON inventory_product (updated_at DESC) "
+        "WHERE is_archived = false AND quantity <= low_stock_threshold"
+    )
+
+
+def remove_low_stock_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS idx_low_stock")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_low_stock_index, remove_low_stock_index),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def add_search_index(apps, schema_editor):
+    # Expression GIN index matching the SearchVector annotation used by
+    # ProductViewSet.get_queryset, so a search request becomes a single
+    # indexed tsquery lookup instead of four ILIKE scans. The expression
+    # mirrors the SQL Django generates for
+    # SearchVector('name', 'sku', 'category', 'tags', config='english').
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX idx_product_search ON inventory_product USING GIN ("
+        "to_tsvector('english', "
+        "COALESCE(\"name\", '') || ' ' || COALESCE(sku, '') || ' ' || "
+        "COALESCE(category, '') || ' ' || COALESCE(tags, '')))"
+    )
+
+
+def remove_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS idx_product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_low_stock_partial_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_index, remove_search_index),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-08-31 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_product_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='product',
+            name='category',
+            field=models.CharField(blank=True, db_index=True, help_text='Product category.', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='is_archived',
+            field=models.BooleanField(db_index=True, default=False, help_text='Whether the product is archived and not in active use.'),
+        ),
+    ]
@@ -12,10 +12,10 @@ class Product(models.Model):
     sku = models.CharField(max_length=100, unique=True, help_text="Stock Keeping Unit, must be unique.")
     tags = models.CharField(max_length=255, blank=True, help_text="Comma-separated tags for easy filtering.")
     description = models.TextField(blank=True, help_text="A detailed description of the product.")
-    category = models.CharField(max_length=100, blank=True, help_text="Product category.")
+    category = models.CharField(max_length=100, blank=True, db_index=True, help_text="Product category.")
     quantity = models.PositiveIntegerField(default=0, help_text="Current quantity in stock.")
     low_stock_threshold = models.PositiveIntegerField(default=10, help_text="Threshold for low stock alerts.")
-    is_archived = models.BooleanField(default=False, help_text="Whether the product is archived and not in active use.")
+    is_archived = models.BooleanField(default=False, db_index=True, help_text="Whether the product is archived and not in active use.")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
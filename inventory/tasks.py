@@ -0,0 +1,437 @@
+import csv
+from io import StringIO
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from auditlog.context import disable_auditlog
+from cacheops import invalidate_model
+from auditlog.models import LogEntry
+from celery import chord, shared_task
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import InventoryLog, Product
+
+REQUIRED_UPLOAD_COLUMNS = {'sku', 'name'}
+
+# Above this row count, Postgres upserts go through a COPY into a temp table
+# instead of batched INSERT ... ON CONFLICT statements.
+COPY_UPSERT_MIN_ROWS = 5000
+
+# Nullable integer dtypes applied once per frame; the vectorized cast runs
+# in C and replaces a Python int() conversion per row.
+COLUMN_TYPES = {'quantity': 'Int64', 'low_stock_threshold': 'Int64'}
+
+PRODUCT_COPY_COLUMNS = (
+    'sku', 'name', 'tags', 'description', 'category', 'quantity',
+    'low_stock_threshold', 'is_archived', 'created_at', 'updated_at'
+)
+
+
+def read_excel_frame(file_obj):
+    """
+    Read an uploaded spreadsheet into a DataFrame.
+    Uses python-calamine (a Rust parser, several times faster and far
+    lighter on memory than openpyxl's DOM) when available, falling back to
+    pandas' default engine otherwise.
+    """
+    try:
+        from python_calamine import CalamineWorkbook
+    except ImportError:
+        return _coerce_text_columns(pd.read_excel(file_obj))
+
+    rows = CalamineWorkbook.from_filelike(file_obj).get_sheet_by_index(0).to_python(
+        skip_empty_area=True
+    )
+    if not rows:
+        return pd.DataFrame()
+    df = pd.DataFrame(rows[1:], columns=[str(c) for c in rows[0]])
+    # Calamine yields '' for empty cells; normalize to NA like read_excel.
+    return _coerce_text_columns(df.replace('', pd.NA))
+
+
+def _coerce_text_columns(df, columns=('sku', 'name')):
+    """
+    Force key text columns read from Excel to str.
+    The parsers infer an all-digit SKU column as numeric, and integer
+    values neither match the varchar column on lookup nor bind as text
+    on insert. (The CSV readers pin these columns via ConvertOptions.)
+    """
+    for col in columns:
+        if col not in df.columns:
+            continue
+        notna = df[col].notna()
+        df[col] = df[col].astype(object)
+        df.loc[notna, col] = df.loc[notna, col].map(
+            lambda v: str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)
+        )
+    return df
+
+
+def _copy_insert_products(products):
+    """
+    Insert new products with COPY FROM STDIN (Postgres only).
+    COPY bypasses the per-row executor/planner loop inside Postgres, so it
+    is used for uploads that contain no existing SKUs; uploads with
+    conflicts still go through the ON CONFLICT upsert path.
+    """
+    columns = ', '.join(PRODUCT_COPY_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY inventory_product ({columns}) FROM STDIN WITH (FORMAT csv)",
+            _write_product_copy_buffer(products)
+        )
+    # copy_expert bypasses the cursor hooks cacheops listens on, so
+    # cached Product querysets must be dropped by hand.
+    invalidate_model(Product)
+
+
+def _write_product_copy_buffer(products):
+    """Serialize product rows into a CSV buffer for COPY FROM STDIN."""
+    now = timezone.now().isoformat()
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    for product in products:
+        writer.writerow([
+            product.sku, product.name, product.tags, product.description,
+            product.category, product.quantity, product.low_stock_threshold,
+            product.is_archived, now, now
+        ])
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_upsert_products(products, update_fields):
+    """
+    Upsert a large batch with COPY into a temp table plus one
+    INSERT ... SELECT ... ON CONFLICT (Postgres only).
+    COPY keeps the Python layer at streaming rate and skips per-row INSERT
+    parsing on the server; the follow-up statement applies all conflicts at
+    once from the temp table.
+    """
+    columns = ', '.join(PRODUCT_COPY_COLUMNS)
+    set_clause = ', '.join(f'{f} = EXCLUDED.{f}' for f in update_fields)
+    with connection.cursor() as cursor:
+        # INCLUDING IDENTITY matters: LIKE copies the NOT NULL on id but
+        # not its identity default, so a COPY that omits id would fail.
+        cursor.execute(
+            "CREATE TEMP TABLE tmp_product_upload "
+            "(LIKE inventory_product INCLUDING DEFAULTS INCLUDING IDENTITY "
+            "EXCLUDING INDEXES) "
+            "ON COMMIT DROP"
+        )
+        cursor.copy_expert(
+            f"COPY tmp_product_upload ({columns}) FROM STDIN WITH (FORMAT csv)",
+            _write_product_copy_buffer(products)
+        )
+        cursor.execute(
+            f"INSERT INTO inventory_product ({columns}) "
+            f"SELECT {columns} FROM tmp_product_upload "
+            f"ON CONFLICT (sku) DO UPDATE SET {set_clause}"
+        )
+        # Drop eagerly: several chunks can run inside the same transaction.
+        cursor.execute("DROP TABLE tmp_product_upload")
+    # As in _copy_insert_products: COPY is invisible to cacheops.
+    invalidate_model(Product)
+
+
+def process_product_frame(df, user):
+    """
+    Validate and upsert one DataFrame of uploaded product rows.
+    Returns a (created_count, updated_count) tuple. Expects to run inside
+    a transaction; raises ValidationError when a row fails validation.
+    """
+    # Validate the whole frame at once with vectorized masks instead of
+    # running a ProductSerializer per row. The masks are C-level pandas
+    # operations, so validation cost no longer scales with Python-per-row
+    # overhead on large uploads.
+    if 'quantity' in df.columns:
+        raw_quantity = df['quantity']
+        df['quantity'] = pd.to_numeric(raw_quantity, errors='coerce')
+
+    # Field-length limits are checked here as well since the rows no longer
+    # pass through ProductSerializer on their way to the database.
+    invalid_mask = (
+        df['sku'].isna() | df['name'].isna()
+        | df['sku'].astype(str).str.len().gt(100)
+        | df['name'].astype(str).str.len().gt(255)
+    )
+    if 'quantity' in df.columns:
+        # A cell that held a value but failed numeric coercion is an
+        # error, not an empty quantity to be silently dropped.
+        invalid_mask |= df['quantity'].lt(0) | (
+            df['quantity'].isna() & raw_quantity.notna()
+        )
+
+    if invalid_mask.any():
+        raise ValidationError({
+            'detail': 'Row validation failed.',
+            'row_index': int(df.index[invalid_mask][0]) + 2,
+            'errors': "'sku' (max 100 chars) and 'name' (max 255 chars) are "
+                      "required and 'quantity' must be a non-negative number."
+        })
+
+    # Only columns that map onto Product fields may reach the model.
+    model_fields = {
+        'sku', 'name', 'tags', 'description', 'category',
+        'quantity', 'low_stock_threshold', 'is_archived'
+    }
+
+    # One vectorized notnull pass over the whole frame; nulls become
+    # None so the per-row filter below is a plain identity check
+    # rather than a pd.notna() call per cell.
+    df = df[[c for c in df.columns if c in model_fields]]
+    for col, dtype in COLUMN_TYPES.items():
+        if col in df:
+            df[col] = df[col].astype(dtype)
+    # astype(object) first so the Int64 columns come out as native Python
+    # ints/None rather than numpy scalars the DB driver can't bind.
+    df = df.astype(object).where(pd.notnull(df), None)
+
+    created_count = 0
+    updated_count = 0
+
+    # A file may list the same SKU twice; keep the last occurrence so the
+    # single ON CONFLICT statement never updates one row twice (Postgres
+    # rejects that) and the counts stay one per resulting product. The
+    # old per-row loop had the same last-write-wins semantics.
+    df = df[~df['sku'].duplicated(keep='last')]
+
+    # One SELECT for every SKU in the frame instead of one per row.
+    skus = df['sku'].tolist()
+    existing_by_sku = {
+        p.sku: p for p in Product.objects.filter(sku__in=skus)
+    }
+
+    to_upsert = []
+    log_specs = []  # (sku, old_quantity, is_new, reason, user)
+
+    # Loop invariants: the reason strings are allocated once, not per row.
+    create_reason = "Bulk upload: Created"
+    update_reason = "Bulk upload: Updated"
+
+    # to_dict('records') converts the frame in one pass; iterrows()
+    # would allocate a fresh Series per row.
+    for record in df.to_dict('records'):
+        product_data = {
+            k: v for k, v in record.items() if v is not None
+        }
+
+        instance = existing_by_sku.get(product_data['sku'])
+
+        if instance:
+            old_quantity = instance.quantity
+            for attr, value in product_data.items():
+                setattr(instance, attr, value)
+            to_upsert.append(instance)
+            log_specs.append(
+                (instance.sku, old_quantity, False, update_reason, user)
+            )
+            updated_count += 1
+        else:
+            product = Product(**product_data)
+            to_upsert.append(product)
+            log_specs.append(
+                (product.sku, 0, True, create_reason, user)
+            )
+            created_count += 1
+
+    # bulk_create does not fire post_save, but keep auditlog's signal
+    # handlers out of this block explicitly so any per-row save added
+    # later cannot reintroduce one audit INSERT per row; the upload gets
+    # a single consolidated entry instead (write_bulk_upload_audit).
+    with disable_auditlog():
+        _upsert_product_rows(
+            df, to_upsert, existing_by_sku, model_fields, skus, log_specs
+        )
+
+    return created_count, updated_count
+
+
+def _upsert_product_rows(df, to_upsert, existing_by_sku, model_fields, skus, log_specs):
+    """Write the prepared rows and their inventory logs to the database."""
+    if not existing_by_sku and connection.vendor == 'postgresql':
+        # Pure-insert frame on Postgres: COPY FROM STDIN skips the
+        # per-row parse/plan loop entirely and is far faster than
+        # batched INSERTs.
+        _copy_insert_products(to_upsert)
+    else:
+        # Single INSERT ... ON CONFLICT (sku) DO UPDATE per batch
+        # instead of a SELECT + INSERT/UPDATE round-trip per row.
+        # Only columns actually present in the file are overwritten
+        # on conflict.
+        update_fields = sorted(
+            (model_fields - {'sku'}) & set(df.columns)
+        ) + ['updated_at']
+        if connection.vendor == 'postgresql' and len(to_upsert) >= COPY_UPSERT_MIN_ROWS:
+            # Very large conflicted batches: COPY into a temp table and
+            # upsert from there in one statement.
+            _copy_upsert_products(to_upsert, update_fields)
+        else:
+            Product.objects.bulk_create(
+                to_upsert,
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=update_fields,
+                batch_size=settings.BULK_BATCH_SIZE,
+            )
+
+    # bulk_create bypasses Product.save(), so write the inventory
+    # logs here in one batch. A single SELECT recovers the pks and
+    # final quantities of the upserted rows.
+    refreshed = {
+        p.sku: p for p in Product.objects.filter(sku__in=skus)
+    }
+    logs = []
+    for sku, old_quantity, is_new, reason, log_user in log_specs:
+        product = refreshed[sku]
+        quantity_change = product.quantity - old_quantity
+        if is_new or quantity_change != 0:
+            logs.append(InventoryLog(
+                product=product,
+                user=log_user,
+                quantity_change=quantity_change,
+                new_quantity=product.quantity,
+                reason=reason
+            ))
+    InventoryLog.objects.bulk_create(logs, batch_size=settings.BULK_BATCH_SIZE)
+
+
+def write_bulk_upload_audit(user, created_count, updated_count):
+    """
+    Record one consolidated audit entry for a whole bulk upload.
+    The per-row auditlog signals are suppressed during the upsert, so a
+    single LogEntry replaces what would otherwise be one audit INSERT
+    per uploaded row.
+    """
+    LogEntry.objects.create(
+        content_type=ContentType.objects.get_for_model(Product),
+        object_pk='bulk-upload',
+        object_repr=(
+            f'Bulk upload: {created_count} created, {updated_count} updated'
+        ),
+        action=LogEntry.Action.CREATE,
+        actor=user,
+        additional_data={'created': created_count, 'updated': updated_count},
+    )
+
+
+@shared_task(queue='inventory')
+def process_product_chunk(records, user_id=None, row_offset=0):
+    """
+    Upsert one chunk of bulk-upload rows in its own transaction.
+    Used by the parallel fan-out below; row_offset keeps validation errors
+    numbered relative to the original file.
+    """
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    df = pd.DataFrame.from_records(records)
+    df.index = pd.RangeIndex(row_offset, row_offset + len(df))
+    with transaction.atomic():
+        created, updated = process_product_frame(df, user)
+    return {'created': created, 'updated': updated}
+
+
+@shared_task(queue='inventory')
+def finalize_product_bulk_upload(results, user_id=None):
+    """
+    Chord callback for the parallel fan-out: consolidate the per-chunk
+    counts and write the single audit entry once every chunk has
+    committed. Reports under the original upload task's id, so status
+    polling is unaffected.
+    """
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    created_count = sum(r['created'] for r in results)
+    updated_count = sum(r['updated'] for r in results)
+    write_bulk_upload_audit(user, created_count, updated_count)
+    return {'created': created_count, 'updated': updated_count}
+
+
+@shared_task(bind=True, queue='inventory')
+def process_product_bulk_upload(self, path, user_id=None):
+    """
+    Process a stored bulk-upload file in the background.
+    The view persists the file to default storage, dispatches this task and
+    returns immediately; the task streams the file through the same upsert
+    pipeline the synchronous path uses and removes the file when done.
+
+    With BULK_UPLOAD_PARALLEL enabled, CSV chunks fan out as a Celery chord
+    so multiple workers parse and write concurrently; the finalizer above
+    consolidates the counts. Each chunk commits independently: throughput
+    is traded for whole-file atomicity.
+    """
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    created_count = 0
+    updated_count = 0
+
+    try:
+        with default_storage.open(path, 'rb') as file_obj:
+            if path.endswith('.csv'):
+                reader = pa_csv.open_csv(
+                    file_obj,
+                    read_options=pa_csv.ReadOptions(block_size=8 << 20),
+                    convert_options=pa_csv.ConvertOptions(column_types={
+                        'sku': pa.string(), 'name': pa.string()
+                    })
+                )
+                row_offset = 0
+                columns_checked = False
+                if settings.BULK_UPLOAD_PARALLEL:
+                    signatures = []
+                    for batch in reader:
+                        chunk = pa.Table.from_batches([batch]).to_pandas()
+                        if not columns_checked:
+                            if not REQUIRED_UPLOAD_COLUMNS.issubset(chunk.columns):
+                                raise ValidationError(
+                                    f'Missing required columns. Required: {list(REQUIRED_UPLOAD_COLUMNS)}'
+                                )
+                            columns_checked = True
+                        signatures.append(process_product_chunk.s(
+                            chunk.to_dict('records'), user_id, row_offset
+                        ))
+                        row_offset += len(chunk)
+                    # Hand over to a chord rather than blocking on
+                    # group(...).get(): the chunks are routed to this same
+                    # queue, so a lone worker would sit here holding its
+                    # only slot while its children wait behind it - a
+                    # guaranteed deadlock. replace() re-points the chord's
+                    # final result at this task's id, and the file can be
+                    # deleted now (the finally below) because the rows
+                    # already travel inside the chunk signatures.
+                    raise self.replace(chord(
+                        signatures,
+                        finalize_product_bulk_upload.s(user_id=user_id),
+                    ))
+                else:
+                    with transaction.atomic():
+                        for batch in reader:
+                            chunk = pa.Table.from_batches([batch]).to_pandas()
+                            chunk.index = pd.RangeIndex(row_offset, row_offset + len(chunk))
+                            row_offset += len(chunk)
+                            if not columns_checked:
+                                if not REQUIRED_UPLOAD_COLUMNS.issubset(chunk.columns):
+                                    raise ValidationError(
+                                        f'Missing required columns. Required: {list(REQUIRED_UPLOAD_COLUMNS)}'
+                                    )
+                                columns_checked = True
+                            created, updated = process_product_frame(chunk, user)
+                            created_count += created
+                            updated_count += updated
+            else:
+                df = read_excel_frame(file_obj)
+                if not REQUIRED_UPLOAD_COLUMNS.issubset(df.columns):
+                    raise ValidationError(
+                        f'Missing required columns. Required: {list(REQUIRED_UPLOAD_COLUMNS)}'
+                    )
+                with transaction.atomic():
+                    created_count, updated_count = process_product_frame(df, user)
+    finally:
+        default_storage.delete(path)
+
+    write_bulk_upload_audit(user, created_count, updated_count)
+    return {'created': created_count, 'updated': updated_count}
@@ -1,15 +1,20 @@
 import csv
+import tempfile
 from io import BytesIO, StringIO
+from unittest.mock import patch
 
 import pandas as pd
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 from auditlog.models import LogEntry
 
 from .models import InventoryLog, Product
+from .tasks import process_product_bulk_upload
 from users.models import Role
 
 User = get_user_model()
@@ -99,7 +104,7 @@ class ProductViewSetTests(APITestCase):
         url = reverse('product-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 3) # Includes archived by default from viewset
+        self.assertEqual(len(response.data['results']), 3) # Includes archived by default from viewset
 
     def test_filter_products_by_category(self):
         """
@@ -108,8 +113,8 @@ class ProductViewSetTests(APITestCase):
         url = f"{reverse('product-list')}?category=Electronics"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
-        self.assertTrue(all(p['category'] == 'Electronics' for p in response.data))
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertTrue(all(p['category'] == 'Electronics' for p in response.data['results']))
 
     def test_search_products_by_name(self):
         """
@@ -118,8 +123,8 @@ class ProductViewSetTests(APITestCase):
         url = f"{reverse('product-list')}?search=Laptop"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Laptop')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Laptop')
 
     def test_update_product_quantity(self):
         """
@@ -148,8 +153,22 @@ class ProductViewSetTests(APITestCase):
         url = reverse('product-low-stock')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['sku'], 'MS200') # Only Mouse is low stock
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['sku'], 'MS200') # Only Mouse is low stock
+
+    def test_export_products_csv(self):
+        """
+        Ensure the export endpoint streams all products as CSV.
+        """
+        url = reverse('product-export')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        lines = content.strip().splitlines()
+        self.assertEqual(len(lines), 4)  # header + 3 products
+        self.assertTrue(lines[0].startswith('sku,name'))
+        self.assertIn('LP100', content)
 
     def _create_test_file(self, data, file_format='csv'):
         """
@@ -203,6 +222,84 @@ class ProductViewSetTests(APITestCase):
         create_log = InventoryLog.objects.get(product=new_product, reason__contains='Bulk upload')
         self.assertEqual(create_log.quantity_change, 15)
 
+    def test_bulk_upload_rejects_non_numeric_quantity(self):
+        """
+        Ensure a row with a non-numeric quantity fails the upload instead
+        of being silently imported without one.
+        """
+        url = reverse('product-bulk-upload')
+        file = self._create_test_file(
+            [{'sku': 'NN100', 'name': 'Bad Quantity', 'quantity': 'abc'}]
+        )
+        response = self.client.post(url, {'file': file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Product.objects.filter(sku='NN100').exists())
+
+    def test_bulk_upload_matches_numeric_sku_as_string(self):
+        """
+        Ensure an all-digit SKU column still matches existing products
+        instead of being treated as integers and re-created.
+        """
+        Product.objects.create(sku='12345', name='Numeric SKU', quantity=5)
+        url = reverse('product-bulk-upload')
+        file = self._create_test_file(
+            [{'sku': '12345', 'name': 'Numeric SKU', 'quantity': 9}]
+        )
+        response = self.client.post(url, {'file': file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(Product.objects.get(sku='12345').quantity, 9)
+
+    @override_settings(BULK_UPLOAD_ASYNC=True, MEDIA_ROOT=tempfile.gettempdir())
+    def test_bulk_upload_async_returns_job_id(self):
+        """
+        Ensure bulk upload dispatches to Celery and returns 202 when async
+        processing is enabled.
+        """
+        url = reverse('product-bulk-upload')
+        file = self._create_test_file([{'sku': 'AS100', 'name': 'Async Widget', 'quantity': 5}])
+        with patch('inventory.views.process_product_bulk_upload.delay') as mock_delay:
+            mock_delay.return_value.id = 'test-job-id'
+            response = self.client.post(url, {'file': file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['job_id'], 'test-job-id')
+        # The advertised URL must actually resolve to the status endpoint.
+        self.assertEqual(
+            response.data['status_url'],
+            reverse('product-bulk-upload-status', args=['test-job-id'])
+        )
+        mock_delay.assert_called_once()
+        default_storage.delete(mock_delay.call_args[0][0])
+
+    @override_settings(MEDIA_ROOT=tempfile.gettempdir())
+    def test_bulk_upload_task_processes_stored_file(self):
+        """
+        Ensure the background task processes a stored file and cleans it up.
+        """
+        file = self._create_test_file([{'sku': 'TSK100', 'name': 'Task Widget', 'quantity': 7}])
+        path = default_storage.save('bulk_uploads/task_test.csv', file)
+        result = process_product_bulk_upload(path, self.regular_user.id)
+        self.assertEqual(result, {'created': 1, 'updated': 0})
+        self.assertTrue(Product.objects.filter(sku='TSK100').exists())
+        self.assertFalse(default_storage.exists(path))
+
+    def test_bulk_upload_xlsx(self):
+        """
+        Ensure bulk upload works for XLSX files.
+        """
+        url = reverse('product-bulk-upload')
+        upload_data = [
+            {'sku': 'XL100', 'name': 'Excel Widget', 'quantity': 12, 'category': 'Office'}
+        ]
+        file = self._create_test_file(upload_data, file_format='xlsx')
+        response = self.client.post(url, {'file': file}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 1)
+        new_product = Product.objects.get(sku='XL100')
+        self.assertEqual(new_product.quantity, 12)
+        self.assertEqual(new_product.category, 'Office')
+
     def test_bulk_upload_missing_columns_fails(self):
         """
         Ensure bulk upload fails if required columns are missing.
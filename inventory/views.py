@@ -1,17 +1,47 @@
+import csv
+
 import pandas as pd
-from django.db import transaction
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from celery.result import AsyncResult
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
 from django.db.models import F, Q
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 from rest_framework.exceptions import ValidationError
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.pagination import CursorPagination
 from auditlog.context import set_actor
 
 from users.permissions import AllowOperatorCreateOnly
 from core.mixins import AuditLogMixin
 from .models import Product
 from .serializers import ProductSerializer, FileUploadSerializer
+from .tasks import (
+    process_product_bulk_upload,
+    process_product_frame,
+    read_excel_frame,
+    write_bulk_upload_audit,
+)
+
+
+class ProductCursorPagination(CursorPagination):
+    """
+    Keyset pagination for product listings.
+    Cursor pagination seeks on the ordering column, so page cost stays
+    constant regardless of how deep into the table the client is.
+    """
+    page_size = 100
+    # updated_at alone is non-unique (bulk uploads stamp whole batches
+    # with one timestamp); the id tiebreaker keeps cursors stable so
+    # pages never skip or repeat tied rows.
+    ordering = ('-updated_at', '-id')
 
 
 class ProductViewSet(AuditLogMixin, viewsets.ModelViewSet):
@@ -22,6 +52,7 @@ class ProductViewSet(AuditLogMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all().order_by('-updated_at')
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticated, AllowOperatorCreateOnly]
+    pagination_class = ProductCursorPagination
     
     def destroy(self, request, *args, **kwargs):
         """
@@ -38,26 +69,37 @@ class ProductViewSet(AuditLogMixin, viewsets.ModelViewSet):
         """
         queryset = super().get_queryset()
 
+        # Parse the query params once; query_params is a property walk plus a
+        # QueryDict lookup on every access and this runs on every list hit.
+        params = self.request.query_params
+        category = params.get('category')
+        is_archived = params.get('is_archived')
+        search_term = params.get('search')
+
         # Handle category filtering
-        category = self.request.query_params.get('category')
         if category:
             queryset = queryset.filter(category=category)
 
         # Handle archival filtering
-        is_archived = self.request.query_params.get('is_archived')
         if is_archived is not None:
             archived_bool = is_archived.lower() in ['true', '1']
             queryset = queryset.filter(is_archived=archived_bool)
 
         # Handle searching
-        search_term = self.request.query_params.get('search')
         if search_term:
-            queryset = queryset.filter(
-                Q(name__icontains=search_term) |
-                Q(sku__icontains=search_term) |
-                Q(category__icontains=search_term) |
-                Q(tags__icontains=search_term)
-            )
+            if connection.vendor == 'postgresql':
+                # One GIN-indexed tsquery match (see the expression index in
+                # migration 0004) instead of four sequential ILIKE scans.
+                queryset = queryset.annotate(
+                    search=SearchVector('name', 'sku', 'category', 'tags', config='english')
+                ).filter(search=SearchQuery(search_term, config='english'))
+            else:
+                queryset = queryset.filter(
+                    Q(name__icontains=search_term) |
+                    Q(sku__icontains=search_term) |
+                    Q(category__icontains=search_term) |
+                    Q(tags__icontains=search_term)
+                )
 
         return queryset
 
@@ -107,8 +149,8 @@ class ProductViewSet(AuditLogMixin, viewsets.ModelViewSet):
             serializer.save(_user=user, _reason=reason)
 
     @action(
-        detail=False, 
-        methods=['post'], 
+        detail=False,
+        methods=['post'],
         url_path='bulk-upload',
         parser_classes=[MultiPartParser, FormParser]
     )
@@ -122,60 +164,77 @@ class ProductViewSet(AuditLogMixin, viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         file_obj = serializer.validated_data['file']
 
+        required_columns = {'sku', 'name'}
+        # Loop invariant: resolve request.user once for the whole upload.
+        user = request.user if request.user.is_authenticated else None
+        created_count = 0
+        updated_count = 0
+
+        if not file_obj.name.endswith(('.csv', '.xls', '.xlsx')):
+            return Response({'error': 'Unsupported file format. Use CSV or XLSX.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if settings.BULK_UPLOAD_ASYNC:
+            # Persist the file and hand processing to the inventory Celery
+            # queue; the worker is released immediately instead of being held
+            # for the whole file.
+            path = default_storage.save(f'bulk_uploads/{file_obj.name}', file_obj)
+            task = process_product_bulk_upload.delay(
+                path, request.user.id if request.user.is_authenticated else None
+            )
+            return Response({
+                'status': 'Bulk upload accepted',
+                'job_id': task.id,
+                'status_url': reverse(
+                    'product-bulk-upload-status', args=[task.id]
+                )
+            }, status=status.HTTP_202_ACCEPTED)
+
         try:
             if file_obj.name.endswith('.csv'):
-                df = pd.read_csv(file_obj)
+                # Stream the CSV as Arrow record batches: pyarrow parses with a
+                # SIMD-vectorized C++ kernel (several times faster than the
+                # pandas engine) and keeps peak memory bounded by the batch
+                # size, so the first DB write starts before the whole file is
+                # parsed.
+                reader = pa_csv.open_csv(
+                    file_obj,
+                    read_options=pa_csv.ReadOptions(block_size=8 << 20),
+                    convert_options=pa_csv.ConvertOptions(column_types={
+                        'sku': pa.string(), 'name': pa.string()
+                    })
+                )
+                row_offset = 0
+                columns_checked = False
+                with transaction.atomic():
+                    for batch in reader:
+                        chunk = pa.Table.from_batches([batch]).to_pandas()
+                        # Keep file-global row numbers for validation errors.
+                        chunk.index = pd.RangeIndex(row_offset, row_offset + len(chunk))
+                        row_offset += len(chunk)
+                        if not columns_checked:
+                            if not required_columns.issubset(chunk.columns):
+                                return Response({
+                                    'error': f'Missing required columns. Required: {list(required_columns)}'
+                                }, status=status.HTTP_400_BAD_REQUEST)
+                            columns_checked = True
+                        created, updated = process_product_frame(chunk, user)
+                        created_count += created
+                        updated_count += updated
             elif file_obj.name.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(file_obj)
-            else:
-                return Response({'error': 'Unsupported file format. Use CSV or XLSX.'}, status=status.HTTP_400_BAD_REQUEST)
+                # Excel has no incremental reader; parse the whole sheet with
+                # calamine (much faster and lighter than openpyxl).
+                df = read_excel_frame(file_obj)
+                if not required_columns.issubset(df.columns):
+                    return Response({
+                        'error': f'Missing required columns. Required: {list(required_columns)}'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                with transaction.atomic():
+                    created_count, updated_count = process_product_frame(df, user)
 
-            required_columns = {'sku', 'name'}
-            if not required_columns.issubset(df.columns):
-                return Response({
-                    'error': f'Missing required columns. Required: {list(required_columns)}'
-                }, status=status.HTTP_400_BAD_REQUEST)
+            # One consolidated audit entry for the whole upload; per-row
+            # auditlog signals are suppressed inside the upsert pipeline.
+            write_bulk_upload_audit(user, created_count, updated_count)
 
-            df = df.where(pd.notnull(df), None)
-            
-            created_count = 0
-            updated_count = 0
-
-            with transaction.atomic():
-                for index, row in df.iterrows():
-                    sku = row.get('sku')
-                    if not sku:
-                        continue
-
-                    product_data = row.to_dict()
-                    product_data = {k: v for k, v in product_data.items() if pd.notna(v)}
-                    user = request.user if request.user.is_authenticated else None
-
-                    if 'quantity' in product_data:
-                        product_data['quantity'] = int(product_data['quantity'])
-
-                    instance = Product.objects.filter(sku=sku).first()
-
-                    if instance:
-                        serializer = ProductSerializer(instance, data=product_data, partial=True)
-                        reason = "Bulk upload: Updated"
-                    else:
-                        serializer = ProductSerializer(data=product_data)
-                        reason = "Bulk upload: Created"
-
-                    if serializer.is_valid():
-                        serializer.save(_user=user, _reason=reason)
-                        if instance:
-                            updated_count += 1
-                        else:
-                            created_count += 1
-                    else:
-                        raise ValidationError({
-                            'detail': 'Row validation failed.',
-                            'row_index': index + 2,
-                            'errors': serializer.errors
-                        })
-            
             return Response({
                 'status': 'Bulk upload successful',
                 'created': created_count,
@@ -188,6 +247,53 @@ class ProductViewSet(AuditLogMixin, viewsets.ModelViewSet):
         except Exception as e:
             return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='bulk-upload-status/(?P<job_id>[^/.]+)'
+    )
+    def bulk_upload_status(self, request, job_id=None):
+        """
+        Report the state of an asynchronous bulk upload job.
+        """
+        result = AsyncResult(job_id)
+        payload = {'job_id': job_id, 'state': result.state}
+        if result.successful():
+            payload['result'] = result.result
+        elif result.failed():
+            payload['error'] = str(result.result)
+        return Response(payload)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        An endpoint to stream the (filtered) product list as a CSV download.
+        Rows are fetched with iterator(chunk_size=2000) and written straight
+        into the response, so peak memory stays bounded by the chunk size
+        rather than the size of the table.
+        """
+        fieldnames = [
+            'sku', 'name', 'category', 'tags', 'description',
+            'quantity', 'low_stock_threshold', 'is_archived'
+        ]
+
+        class Echo:
+            """A write-only buffer that hands each CSV line back to the caller."""
+            def write(self, value):
+                return value
+
+        writer = csv.writer(Echo())
+        rows = self.get_queryset().values_list(*fieldnames).iterator(chunk_size=2000)
+
+        def stream():
+            yield writer.writerow(fieldnames)
+            for row in rows:
+                yield writer.writerow(row)
+
+        response = StreamingHttpResponse(stream(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="products.csv"'
+        return response
+
     @action(detail=False, methods=['get'])
     def low_stock(self, request):
         """
@@ -197,5 +303,9 @@ class ProductViewSet(AuditLogMixin, viewsets.ModelViewSet):
             quantity__lte=F('low_stock_threshold'),
             is_archived=False
         )
+        page = self.paginate_queryset(low_stock_products)
+        if page is not None:
+            serializer = ProductSerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = ProductSerializer(low_stock_products, many=True)
         return Response(serializer.data)
@@ -46,30 +46,93 @@ class Outbound(models.Model):
     def __str__(self):
         return f'Outbound #{self.id} - {self.product.name} to {self.customer.name}'
 
+    @classmethod
+    def bulk_complete(cls, queryset, user=None, reason=None):
+        """
+        Complete a batch of outbounds with a handful of queries.
+
+        Instead of one save() per record (each with its own transaction,
+        stock UPDATE and log INSERT), quantities are summed per product,
+        each product gets one conditional UPDATE, the inventory logs go
+        through a single bulk_create and the statuses flip in one UPDATE.
+        Raises ValueError if any product lacks stock; nothing is committed
+        in that case.
+        """
+        from django.db import connection, transaction
+        from django.utils import timezone
+
+        pending = queryset.exclude(status='COMPLETED')
+        with transaction.atomic():
+            totals = pending.values('product_id').annotate(
+                total=models.Sum('quantity')
+            )
+            logs = []
+            with connection.cursor() as cursor:
+                for entry in totals:
+                    cursor.execute(
+                        "UPDATE inventory_product "
+                        "SET quantity = quantity - %s "
+                        "WHERE id = %s AND quantity >= %s "
+                        "RETURNING quantity",
+                        [entry['total'], entry['product_id'], entry['total']],
+                    )
+                    row = cursor.fetchone()
+                    if row is None:
+                        product = Product.objects.only('name', 'quantity').get(
+                            pk=entry['product_id']
+                        )
+                        raise ValueError(
+                            f"Not enough stock for {product.name}. "
+                            f"Available: {product.quantity}, Requested: {entry['total']}"
+                        )
+                    logs.append(InventoryLog(
+                        product_id=entry['product_id'],
+                        quantity_change=-entry['total'],
+                        new_quantity=row[0],
+                        user=user,
+                        reason=f"Bulk outbound completion. {reason or ''}".strip(),
+                    ))
+            InventoryLog.objects.bulk_create(
+                logs, batch_size=settings.BULK_BATCH_SIZE
+            )
+            return pending.update(
+                status='COMPLETED', updated_at=timezone.now()
+            )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the status as loaded so save() can detect transitions
+        # without re-fetching the row.
+        instance._loaded_status = instance.status
+        return instance
+
     def save(self, *args, **kwargs):
         # Pop custom kwargs before calling super().save()
         _user = kwargs.pop('_user', None)
         _reason = kwargs.pop('_reason', None)
 
-        # Store the original status to detect changes
+        # The original status was stashed by from_db when the instance was
+        # loaded, so no extra SELECT is needed to detect changes.
         is_new = self._state.adding
-        if not is_new:
-            old_instance = Outbound.objects.get(pk=self.pk)
-            old_status = old_instance.status
-        else:
-            old_status = None
+        old_status = None if is_new else getattr(self, '_loaded_status', None)
 
         # If created_by is not set, use the _user from kwargs
         if is_new and not self.created_by and _user:
             self.created_by = _user
 
-        # Check if status is changing to COMPLETED
+        # Check if status is changing to COMPLETED. When the caller names the
+        # changed fields and status is not among them, no transition can
+        # happen and the check is skipped outright.
+        update_fields = kwargs.get('update_fields')
+        status_may_change = update_fields is None or 'status' in update_fields
         status_changing_to_completed = False
-        if not is_new and self.status == 'COMPLETED' and old_status != 'COMPLETED':
+        if not is_new and status_may_change and self.status == 'COMPLETED' and old_status != 'COMPLETED':
             status_changing_to_completed = True
             
         # Call parent save method
         super().save(*args, **kwargs)
+        self._loaded_status = self.status
 
         # Handle inventory deduction separately, after the main save
         if status_changing_to_completed:
@@ -77,38 +140,49 @@ class Outbound(models.Model):
             
     def _deduct_inventory(self, user, reason):
         """Handle inventory deduction and logging when an outbound is completed."""
-        from django.db import transaction
-        
-        try:
-            with transaction.atomic():
-                # Get the latest version of the product with a lock
-                product = Product.objects.select_for_update().get(pk=self.product.pk)
-                
-                # Check if we have enough stock
-                if product.quantity < self.quantity:
-                    raise ValueError(f"Not enough stock for {product.name}. Available: {product.quantity}, Requested: {self.quantity}")
-                
-                # Update the quantity directly in the database
-                Product.objects.filter(pk=product.pk).update(
-                    quantity=models.F('quantity') - self.quantity
+        from django.db import connection, transaction
+
+        # savepoint=False: this block runs nested inside the caller's
+        # atomic (e.g. complete_outbound), and a failure here always
+        # propagates out of that outer block too, so a savepoint to roll
+        # back to partially would never be used.
+        with transaction.atomic(savepoint=False):
+            # One conditional UPDATE ... RETURNING replaces the previous
+            # SELECT FOR UPDATE / check / UPDATE / re-SELECT sequence: the
+            # database applies the stock check and the decrement atomically,
+            # so no explicit row lock is needed. Because quantity is not a
+            # key column, Postgres takes the weaker FOR NO KEY UPDATE row
+            # lock here, so concurrent inserts validating FKs against this
+            # product are not blocked while the deduction commits.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE inventory_product "
+                    "SET quantity = quantity - %s "
+                    "WHERE id = %s AND quantity >= %s "
+                    "RETURNING quantity",
+                    [self.quantity, self.product_id, self.quantity],
                 )
-                
-                # Get the updated product
-                updated_product = Product.objects.get(pk=product.pk)
-                
-                # Create the inventory log
-                InventoryLog.objects.create(
-                    product=updated_product,
-                    quantity_change=-self.quantity,
-                    new_quantity=updated_product.quantity,
-                    user=user,
-                    reason=f"Outbound #{self.id} completed. {reason or ''}".strip()
+                row = cursor.fetchone()
+
+            if row is None:
+                available = Product.objects.values_list(
+                    'quantity', flat=True
+                ).get(pk=self.product_id)
+                raise ValueError(
+                    f"Not enough stock for {self.product.name}. "
+                    f"Available: {available}, Requested: {self.quantity}"
                 )
-                
-                return True
-        except Exception:
-            # Simply re-raise any exceptions that occur
-            raise
+
+            # Create the inventory log with the quantity returned by the UPDATE
+            InventoryLog.objects.create(
+                product_id=self.product_id,
+                quantity_change=-self.quantity,
+                new_quantity=row[0],
+                user=user,
+                reason=f"Outbound #{self.id} completed. {reason or ''}".strip()
+            )
+
+            return True
 
 
 
@@ -1,4 +1,5 @@
 from core.serializers import AttachmentSerializer
+from inventory.models import Product
 from rest_framework import serializers
 
 from .models import Customer, Outbound
@@ -16,6 +17,15 @@ class OutboundSerializer(serializers.ModelSerializer):
     """
     Serializer for the Outbound model.
     """
+    # The PK fields resolve their targets with a SELECT on every create and
+    # update; only() keeps those rows to the columns validate() and the
+    # *_name fields actually read instead of fetching every column.
+    customer = serializers.PrimaryKeyRelatedField(
+        queryset=Customer.objects.only('id', 'name', 'email')
+    )
+    product = serializers.PrimaryKeyRelatedField(
+        queryset=Product.objects.only('id', 'name', 'quantity')
+    )
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
     attachments = AttachmentSerializer(many=True, read_only=True)
@@ -70,7 +80,12 @@ class OutboundSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save(_user=user, _reason=reason)
+        # Name the changed fields so save() writes only those columns and can
+        # skip the status-transition bookkeeping when status isn't touched.
+        # updated_at is listed explicitly because auto_now fields are only
+        # refreshed when included in update_fields.
+        update_fields = list(validated_data.keys()) + ['updated_at'] if validated_data else None
+        instance.save(_user=user, _reason=reason, update_fields=update_fields)
         return instance
 
 class OutboundBulkUploadSerializer(serializers.Serializer):
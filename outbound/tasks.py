@@ -0,0 +1,179 @@
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from celery import shared_task
+from core.utils import normalize_headers
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
+from inventory.models import Product
+from rest_framework.exceptions import ValidationError
+
+from .models import Customer, Outbound
+
+REQUIRED_UPLOAD_COLUMNS = {'product_sku', 'customer_email', 'quantity', 'outbound_date'}
+
+
+def iter_csv_frames(file_obj):
+    """
+    Yield DataFrame chunks from an uploaded CSV.
+    pyarrow parses with a SIMD-vectorized C++ kernel (the same reader the
+    inventory bulk path uses), so the pandas parser never runs; peak memory
+    stays bounded by the reader's block size.
+    """
+    reader = pa_csv.open_csv(
+        file_obj,
+        read_options=pa_csv.ReadOptions(block_size=8 << 20),
+        convert_options=pa_csv.ConvertOptions(column_types={
+            'product_sku': pa.string(), 'customer_email': pa.string()
+        })
+    )
+    for batch in reader:
+        yield pa.Table.from_batches([batch]).to_pandas()
+
+
+def _build_outbound_rows(df, user):
+    """
+    Validate one normalized bulk-upload frame and build Outbound objects.
+    Returns an (outbounds, errors) tuple; row numbers in the error strings
+    come from the frame's index, so chunked callers keep file-global
+    numbering by assigning a RangeIndex offset.
+    """
+    # Two IN queries resolve every product and customer referenced in the
+    # frame; left-merging against those frames validates all rows with
+    # vectorized column operations instead of Python work per row.
+    skus = df['product_sku'].dropna().unique().tolist()
+    emails = df['customer_email'].dropna().unique().tolist()
+    prod_df = pd.DataFrame.from_records(
+        Product.objects.filter(sku__in=skus).values('id', 'sku', 'name', 'quantity'),
+        columns=['id', 'sku', 'name', 'quantity'],
+    ).rename(columns={'id': 'product_id', 'name': 'product_name', 'quantity': 'stock'})
+    cust_df = pd.DataFrame.from_records(
+        Customer.objects.filter(email__in=emails).values('id', 'email'),
+        columns=['id', 'email'],
+    ).rename(columns={'id': 'customer_id'})
+
+    df['qty'] = pd.to_numeric(df['quantity'], errors='coerce')
+    merged = (
+        df.merge(prod_df, left_on='product_sku', right_on='sku', how='left')
+          .merge(cust_df, left_on='customer_email', right_on='email', how='left')
+    )
+    # merge() resets the index; restore it so error rows stay file-global.
+    merged.index = df.index
+
+    # Each failure class is one boolean mask (a C-level pass over the
+    # column); rows failing an earlier check keep that check's message,
+    # matching the order of the old per-row loop.
+    missing_product = merged['product_id'].isna()
+    missing_customer = merged['customer_id'].isna()
+    bad_quantity = merged['qty'].isna() | merged['qty'].mod(1).ne(0) | merged['qty'].lt(0)
+    no_stock = ~missing_product & ~bad_quantity & merged['stock'].lt(merged['qty'])
+
+    errors = []
+    failed = missing_product | missing_customer | bad_quantity | no_stock
+    # Error strings are only rendered for the failing subset.
+    for pos, row in merged.loc[failed].iterrows():
+        line = pos + 2
+        if missing_product[pos]:
+            errors.append(f"Row {line}: Product with SKU '{row['product_sku']}' not found.")
+        elif missing_customer[pos]:
+            errors.append(f"Row {line}: Customer with email '{row['customer_email']}' not found.")
+        elif bad_quantity[pos]:
+            errors.append(f"Row {line}: Invalid quantity. Must be a whole number.")
+        else:
+            errors.append(f"Row {line}: Not enough stock for {row['product_name']}. Available: {int(row['stock'])}, Requested: {int(row['qty'])}")
+
+    if errors:
+        return [], errors
+
+    merged = merged.astype(object).where(pd.notnull(merged), None)
+    outbounds = [
+        Outbound(
+            product_id=int(row['product_id']),
+            customer_id=int(row['customer_id']),
+            quantity=int(row['qty']),
+            outbound_date=row['parsed_date'],
+            so_ref=row.get('so_ref'),
+            notes=row.get('notes'),
+            created_by=user
+        )
+        for row in merged.to_dict('records')
+    ]
+    return outbounds, errors
+
+
+def process_outbound_frames(frames, user):
+    """
+    Validate and insert bulk-upload frames inside one transaction.
+    Returns the number of outbounds created; raises ValidationError (whose
+    detail matches the API's existing error payloads) on the first failing
+    chunk, rolling everything back.
+    """
+    created_count = 0
+    row_offset = 0
+    columns_checked = False
+
+    with transaction.atomic():
+        for df in frames:
+            df.columns = normalize_headers(df.columns)
+            # Keep file-global row numbers for validation errors.
+            df.index = pd.RangeIndex(row_offset, row_offset + len(df))
+            row_offset += len(df)
+
+            if not columns_checked:
+                if not REQUIRED_UPLOAD_COLUMNS.issubset(df.columns):
+                    missing_cols = REQUIRED_UPLOAD_COLUMNS - set(df.columns)
+                    raise ValidationError(
+                        {'error': f'Missing required columns: {list(missing_cols)}'}
+                    )
+                columns_checked = True
+
+            df['parsed_date'] = pd.to_datetime(df['outbound_date'], errors='coerce').dt.date
+            invalid_dates = df[df['parsed_date'].isna()]
+            if not invalid_dates.empty:
+                error_rows = [i + 2 for i in invalid_dates.index.tolist()]
+                raise ValidationError({
+                    'error': 'Invalid or ambiguous date format found.',
+                    'details': f'Please use a consistent format like YYYY-MM-DD. Check rows: {error_rows}'
+                })
+
+            outbounds, errors = _build_outbound_rows(df, user)
+            if errors:
+                raise ValidationError(
+                    {'detail': 'Errors found in file', 'errors': errors}
+                )
+
+            Outbound.objects.bulk_create(
+                outbounds, batch_size=settings.BULK_BATCH_SIZE
+            )
+            created_count += len(outbounds)
+            # Drop the chunk's model instances now rather than keeping them
+            # alive while the next chunk is parsed; bounds resident memory
+            # to roughly one chunk.
+            outbounds.clear()
+
+    return created_count
+
+
+@shared_task(queue='outbound')
+def process_outbound_bulk_upload(path, user_id=None):
+    """
+    Process a stored outbound bulk-upload file in the background.
+    The view persists the file to default storage, dispatches this task and
+    returns immediately; the task streams the file through the same
+    validate/insert pipeline the synchronous path uses and removes the file
+    when done. Row errors surface through the task result.
+    """
+    user = get_user_model().objects.filter(pk=user_id).first() if user_id else None
+    try:
+        with default_storage.open(path, 'rb') as file_obj:
+            if path.endswith('.csv'):
+                frames = iter_csv_frames(file_obj)
+            else:
+                frames = [pd.read_excel(file_obj)]
+            created_count = process_outbound_frames(frames, user)
+    finally:
+        default_storage.delete(path)
+
+    return {'created': created_count}
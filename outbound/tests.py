@@ -1,5 +1,10 @@
+import tempfile
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
 from django.urls import reverse
 from inventory.models import InventoryLog, Product
 from rest_framework import status
@@ -11,51 +16,51 @@ User = get_user_model()
 
 
 class OutboundAPITests(APITestCase):
-    def setUp(self):
-        """Set up initial data for tests."""
+    @classmethod
+    def setUpTestData(cls):
+        """Set up initial data once for the whole class.
+
+        setUpTestData runs a single time inside a class-wide transaction, so
+        the fixture INSERTs aren't repeated before every test. No test here
+        authenticates with a password (force_authenticate is used), so the
+        users skip password hashing entirely.
+        """
         # Create roles first
         from users.models import Role
-        self.admin_role = Role.objects.create(name='Admin', description='Administrator')
-        self.manager_role = Role.objects.create(name='Manager', description='Manager')
-        self.operator_role = Role.objects.create(name='Operator', description='Operator')
-        
+        cls.admin_role = Role.objects.create(name='Admin', description='Administrator')
+        cls.manager_role = Role.objects.create(name='Manager', description='Manager')
+        cls.operator_role = Role.objects.create(name='Operator', description='Operator')
+
         # Create users with different roles
-        self.admin_user = User.objects.create_user(username='admin_user', password='testpassword')
-        self.admin_user.role = self.admin_role
-        self.admin_user.save()
-        
-        self.manager_user = User.objects.create_user(username='manager_user', password='testpassword')
-        self.manager_user.role = self.manager_role
-        self.manager_user.save()
-        
-        self.operator_user = User.objects.create_user(username='operator_user', password='testpassword')
-        self.operator_user.role = self.operator_role
-        self.operator_user.save()
-        
-        # Default to admin user for most operations
-        self.client.force_authenticate(user=self.admin_user)
+        cls.admin_user = User.objects.create(username='admin_user', password='!', role=cls.admin_role)
+        cls.manager_user = User.objects.create(username='manager_user', password='!', role=cls.manager_role)
+        cls.operator_user = User.objects.create(username='operator_user', password='!', role=cls.operator_role)
 
-        self.product = Product.objects.create(
+        cls.product = Product.objects.create(
             name='Test Product',
             sku='TP001',
             category='Electronics',
             quantity=100,
             low_stock_threshold=10
         )
-        self.customer = Customer.objects.create(
+        cls.customer = Customer.objects.create(
             name='Test Customer',
             email='customer@example.com',
             phone='1234567890'
         )
-        self.outbound = Outbound.objects.create(
-            customer=self.customer,
-            product=self.product,
+        cls.outbound = Outbound.objects.create(
+            customer=cls.customer,
+            product=cls.product,
             quantity=10,
             outbound_date='2025-07-05',
             status='PENDING',
             so_ref='SO-INITIAL'
         )
 
+    def setUp(self):
+        # Default to admin user for most operations
+        self.client.force_authenticate(user=self.admin_user)
+
     def test_create_customer(self):
         """Ensure we can create a new customer."""
         url = reverse('customer-list')
@@ -131,6 +136,30 @@ class OutboundAPITests(APITestCase):
         self.assertEqual(log.quantity_change, -10)
 
 
+    def test_bulk_complete_deducts_stock_once_per_product(self):
+        """Ensure bulk_complete deducts grouped stock and logs per product."""
+        Outbound.objects.create(
+            customer=self.customer,
+            product=self.product,
+            quantity=5,
+            outbound_date='2025-07-06',
+            status='PENDING'
+        )
+        initial_log_count = InventoryLog.objects.count()
+
+        completed = Outbound.bulk_complete(Outbound.objects.all(), user=self.admin_user)
+
+        self.assertEqual(completed, 2)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 85)  # 100 - (10 + 5)
+        self.assertFalse(Outbound.objects.exclude(status='COMPLETED').exists())
+
+        # One log per affected product, not per outbound
+        self.assertEqual(InventoryLog.objects.count(), initial_log_count + 1)
+        log = InventoryLog.objects.latest('timestamp')
+        self.assertEqual(log.quantity_change, -15)
+        self.assertEqual(log.new_quantity, 85)
+
     def test_create_outbound_with_attachment(self):
         """Ensure we can create an outbound with a file attachment."""
         url = reverse('outbound-list')
@@ -185,6 +214,31 @@ class OutboundAPITests(APITestCase):
         self.assertIn('Not enough stock for', response.data['errors'][0])
         self.assertEqual(Outbound.objects.count(), 1) # No new outbound created
 
+    @override_settings(BULK_UPLOAD_ASYNC=True, MEDIA_ROOT=tempfile.gettempdir())
+    def test_bulk_upload_async_returns_job_id(self):
+        """With async uploads enabled, the endpoint stores the file and returns 202."""
+        csv_content = (
+            'product_sku,customer_email,quantity,outbound_date\n'
+            'TP001,customer@example.com,5,2025-07-05'
+        )
+        csv_file = SimpleUploadedFile("bulk_async.csv", csv_content.encode('utf-8'), content_type="text/csv")
+        url = reverse('outbound-bulk-upload')
+
+        with patch('outbound.views.process_outbound_bulk_upload.delay') as mock_delay:
+            mock_delay.return_value.id = 'job-123'
+            response = self.client.post(url, {'file': csv_file}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['job_id'], 'job-123')
+        self.assertEqual(
+            response.data['status_url'],
+            reverse('outbound-bulk-upload-status', args=['job-123'])
+        )
+        mock_delay.assert_called_once()
+        stored_path = mock_delay.call_args.args[0]
+        self.assertTrue(default_storage.exists(stored_path))
+        default_storage.delete(stored_path)
+
     def test_update_outbound(self):
         """Ensure we can update a pending outbound record."""
         url = reverse('outbound-detail', kwargs={'pk': self.outbound.pk})
@@ -1,7 +1,14 @@
+from zipfile import BadZipFile
+
 import pandas as pd
+from celery.result import AsyncResult
 from core.models import Attachment
+from django.conf import settings
+from django.core.files.storage import default_storage
 from django.db import transaction
-from inventory.models import Product
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.urls import reverse
 from rest_framework import permissions, status, viewsets
 from users.permissions import IsAdminUser, AllowOperatorCreateOnly
 from core.mixins import AuditLogMixin
@@ -15,7 +22,11 @@ from .serializers import (
     OutboundBulkUploadSerializer,
     OutboundSerializer,
 )
-
+from .tasks import (
+    iter_csv_frames,
+    process_outbound_bulk_upload,
+    process_outbound_frames,
+)
 
 class CustomerViewSet(viewsets.ModelViewSet):
     """API endpoint that allows customers to be viewed or edited."""
@@ -33,10 +44,70 @@ class OutboundViewSet(AuditLogMixin, viewsets.ModelViewSet):
     API endpoint for managing outbound transactions.
     Operators can create outbound records but cannot update or delete them.
     """
-    queryset = Outbound.objects.all().order_by('-created_at')
+    # customer.name / product.name are serialized per row and created_by is
+    # rendered as its pk; the JOINs avoid an extra SELECT per outbound
+    # (classic N+1) on list and retrieve. attachments is a GenericRelation,
+    # which can't be joined, so it's prefetched in one extra query.
+    queryset = Outbound.objects.select_related(
+        'customer', 'product', 'created_by'
+    ).prefetch_related('attachments').order_by('-created_at')
     serializer_class = OutboundSerializer
     permission_classes = [permissions.IsAuthenticated, AllowOperatorCreateOnly]
 
+    def list(self, request, *args, **kwargs):
+        """
+        List outbounds from a values() queryset instead of the serializer.
+        Building plain dicts skips DRF's per-field to_representation walk,
+        which is the bulk of list-view CPU on large result sets; retrieve,
+        create and update keep the full serializer (and its nested
+        attachments).
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+
+        # One aggregate derives a cheap ETag from row count and the newest
+        # updated_at; a matching If-None-Match answers 304 without running
+        # the values() fetch or building the payload at all.
+        stamp = queryset.aggregate(count=Count('id'), latest=Max('updated_at'))
+        latest = stamp['latest'].isoformat() if stamp['latest'] else 'empty'
+        etag = f'"outbounds-{stamp["count"]}-{latest}"'
+        # GZipMiddleware weakens the outgoing ETag to W/"..." on compressed
+        # responses, so clients echo the weak form; strip the prefix and
+        # compare weakly or the short-circuit never fires.
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        if if_none_match.removeprefix('W/') == etag:
+            return HttpResponseNotModified()
+
+        rows = queryset.values(
+            'id', 'customer_id', 'customer__name', 'product_id',
+            'product__name', 'quantity', 'so_ref', 'outbound_date',
+            'status', 'notes', 'created_by_id', 'created_at', 'updated_at'
+        )
+        page = self.paginate_queryset(rows)
+        data = [
+            {
+                'id': row['id'],
+                'customer': row['customer_id'],
+                'customer_name': row['customer__name'],
+                'product': row['product_id'],
+                'product_name': row['product__name'],
+                'quantity': row['quantity'],
+                'so_ref': row['so_ref'],
+                'outbound_date': row['outbound_date'],
+                'status': row['status'],
+                'notes': row['notes'],
+                'created_by': row['created_by_id'],
+                'created_at': row['created_at'],
+                'updated_at': row['updated_at'],
+            }
+            for row in (page if page is not None else rows)
+        ]
+        if page is not None:
+            response = self.get_paginated_response(data)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -50,12 +121,29 @@ class OutboundViewSet(AuditLogMixin, viewsets.ModelViewSet):
 
         if uploaded_attachments:
             outbound_instance = serializer.instance
-            for attachment_file in uploaded_attachments:
-                Attachment.objects.create(content_object=outbound_instance, file=attachment_file)
+            # One multi-row INSERT instead of one round trip per file.
+            Attachment.objects.bulk_create([
+                Attachment(content_object=outbound_instance, file=attachment_file)
+                for attachment_file in uploaded_attachments
+            ])
 
-        headers = self.get_success_headers(serializer.data)
+        headers = self.get_success_headers(serializer.instance)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def get_success_headers(self, instance):
+        """
+        Build the Location header straight from the new instance's pk.
+        The stock implementation probes the serialized payload for a 'url'
+        field this serializer doesn't have (returning no header at all),
+        and probing would force serialization before the response body
+        needs it.
+        """
+        return {
+            'Location': self.request.build_absolute_uri(
+                reverse('outbound-detail', args=[instance.pk])
+            )
+        }
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
@@ -70,8 +158,11 @@ class OutboundViewSet(AuditLogMixin, viewsets.ModelViewSet):
             raise ValidationError({'detail': str(e)})
 
         if uploaded_attachments:
-            for attachment_file in uploaded_attachments:
-                Attachment.objects.create(content_object=instance, file=attachment_file)
+            # One multi-row INSERT instead of one round trip per file.
+            Attachment.objects.bulk_create([
+                Attachment(content_object=instance, file=attachment_file)
+                for attachment_file in uploaded_attachments
+            ])
 
         if getattr(instance, '_prefetched_objects_cache', None):
             instance._prefetched_objects_cache = {}
@@ -85,72 +176,66 @@ class OutboundViewSet(AuditLogMixin, viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         file = serializer.validated_data['file']
 
-        try:
-            df = pd.read_csv(file) if file.name.endswith('.csv') else pd.read_excel(file)
-            df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
-
-            required_cols = {'product_sku', 'customer_email', 'quantity', 'outbound_date'}
-            if not required_cols.issubset(df.columns):
-                missing_cols = required_cols - set(df.columns)
-                return Response(
-                    {'error': f'Missing required columns: {list(missing_cols)}'},
-                    status=status.HTTP_400_BAD_REQUEST
+        if settings.BULK_UPLOAD_ASYNC:
+            # Persist the file and hand processing to the outbound Celery
+            # queue; the worker is released immediately instead of being held
+            # for the whole file.
+            path = default_storage.save(f'bulk_uploads/outbound/{file.name}', file)
+            task = process_outbound_bulk_upload.delay(
+                path, request.user.id if request.user.is_authenticated else None
+            )
+            return Response({
+                'status': 'Bulk upload accepted',
+                'job_id': task.id,
+                'status_url': reverse(
+                    'outbound-bulk-upload-status', args=[task.id]
                 )
+            }, status=status.HTTP_202_ACCEPTED)
 
-            df['parsed_date'] = pd.to_datetime(df['outbound_date'], errors='coerce').dt.date
-            invalid_dates = df[df['parsed_date'].isna()]
-            if not invalid_dates.empty:
-                error_rows = [i + 2 for i in invalid_dates.index.tolist()]
-                return Response(
-                    {
-                        'error': 'Invalid or ambiguous date format found.',
-                        'details': f'Please use a consistent format like YYYY-MM-DD. Check rows: {error_rows}'
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        try:
+            if file.name.endswith('.csv'):
+                # Chunked parsing keeps peak memory bounded by one chunk and
+                # pipelines parsing with the inserts instead of holding the
+                # whole file (plus a normalized copy) in RAM.
+                frames = iter_csv_frames(file)
+            else:
+                # Excel has no incremental reader; parse the sheet whole.
+                frames = [pd.read_excel(file)]
 
-            outbounds_to_create = []
-            errors = []
-            with transaction.atomic():
-                for index, row in df.iterrows():
-                    try:
-                        product = Product.objects.get(sku=row['product_sku'])
-                        customer = Customer.objects.get(email=row['customer_email'])
-                        quantity = int(row['quantity'])
-
-                        if product.quantity < quantity:
-                            errors.append(f"Row {index + 2}: Not enough stock for {product.name}. Available: {product.quantity}, Requested: {quantity}")
-                            continue
-
-                        outbounds_to_create.append(
-                            Outbound(
-                                product=product,
-                                customer=customer,
-                                quantity=quantity,
-                                outbound_date=row['parsed_date'],
-                                so_ref=row.get('so_ref'),
-                                notes=row.get('notes'),
-                                created_by=request.user
-                            )
-                        )
-                    except Product.DoesNotExist:
-                        errors.append(f"Row {index + 2}: Product with SKU '{row['product_sku']}' not found.")
-                    except Customer.DoesNotExist:
-                        errors.append(f"Row {index + 2}: Customer with email '{row['customer_email']}' not found.")
-                    except ValueError:
-                        errors.append(f"Row {index + 2}: Invalid quantity. Must be a whole number.")
-
-                if errors:
-                    transaction.set_rollback(True)
-                    return Response({'detail': 'Errors found in file', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
-
-                Outbound.objects.bulk_create(outbounds_to_create)
-
-            return Response({'detail': f'{len(outbounds_to_create)} outbound records created successfully.'}, status=status.HTTP_201_CREATED)
-
-        except Exception as e:
+            # Loop invariant: request.user goes through lazy auth middleware on
+            # each access, so resolve it once for the whole file.
+            created_count = process_outbound_frames(frames, request.user)
+
+            return Response({'detail': f'{created_count} outbound records created successfully.'}, status=status.HTTP_201_CREATED)
+
+        except ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        except (ValueError, BadZipFile) as e:
+            # Malformed files: pyarrow and pandas parse errors derive from
+            # ValueError, openpyxl raises BadZipFile for corrupt xlsx. The
+            # per-row DoesNotExist handling the old catch-all also absorbed
+            # is gone — lookups are dict misses now — so anything else is a
+            # real bug and should surface as a 500.
             return Response({'error': f'An error occurred: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
-            
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='bulk-upload-status/(?P<job_id>[^/.]+)'
+    )
+    def bulk_upload_status(self, request, job_id=None):
+        """
+        Report the state of an asynchronous bulk upload job.
+        """
+        result = AsyncResult(job_id)
+        payload = {'job_id': job_id, 'state': result.state}
+        if result.successful():
+            payload['result'] = result.result
+        elif result.failed():
+            payload['error'] = str(result.result)
+        return Response(payload)
+
     @action(detail=True, methods=['post'])
     def complete_outbound(self, request, pk=None):
         """Mark an outbound record as completed and update inventory.
@@ -163,21 +248,31 @@ class OutboundViewSet(AuditLogMixin, viewsets.ModelViewSet):
         3. Creating an inventory log entry
         """
         outbound = self.get_object()
-        
+
         if outbound.status == 'COMPLETED':
             return Response({'detail': 'Outbound is already completed'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Check if there's enough stock before attempting to complete
-        if outbound.product.quantity < outbound.quantity:
-            return Response(
-                {'detail': f'Not enough stock. Available: {outbound.product.quantity}, Required: {outbound.quantity}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Just update status - the model's save method will handle inventory deduction
-        # and log creation via the _deduct_inventory method automatically
+
+        # No pre-read stock check here: the deduction is one conditional
+        # UPDATE (quantity >= requested) inside the model, so the database
+        # applies check and decrement atomically. A Python-side compare on a
+        # previously read value would just reintroduce the race it closes.
         outbound.status = 'COMPLETED'
-        outbound.save(_user=request.user, _reason='Completed via API')
-            
-        return Response({'detail': 'Outbound completed successfully'}, status=status.HTTP_200_OK)
+        try:
+            # atomic() ties the status write to the deduction: if the stock
+            # UPDATE matches no row, the ValueError rolls both back.
+            with transaction.atomic():
+                # Only the status transition is being written; naming the
+                # fields keeps notes and the other columns out of the UPDATE.
+                outbound.save(
+                    _user=request.user, _reason='Completed via API',
+                    update_fields=['status', 'updated_at']
+                )
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+
+        # Minimal payload on purpose: the client already holds the record,
+        # so there is no reason to re-run the serializer (and its related
+        # lookups) on the instance it just completed. The detail endpoint
+        # serves the full object if needed.
+        return Response({'id': outbound.id, 'status': 'COMPLETED'}, status=status.HTTP_200_OK)
 
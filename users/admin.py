@@ -1,31 +1,79 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import OperationalError, connection, transaction
+from django.utils.functional import cached_property
+
 from .models import User, Role, Permission, RolePermission, ActivityLog
 
+
+class TimeoutPaginator(Paginator):
+    """
+    Paginator that gives up on slow COUNT(*) queries.
+    ActivityLog grows without bound and the admin changelist counts it on
+    every load; cap the COUNT at 200ms on Postgres and fall back to a large
+    sentinel so the page renders in constant time regardless of table size.
+    """
+    @cached_property
+    def count(self):
+        if connection.vendor != 'postgresql':
+            return super().count
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout TO 200")
+                return super().count
+        except OperationalError:
+            return 9999999999
+
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
     """Admin configuration for the User model."""
     list_display = ('username', 'email', 'role')
+    # role is rendered per row; JOIN it instead of one SELECT per user.
+    list_select_related = ('role',)
     search_fields = ('username', 'email')
+    # Autocomplete widgets issue a LIMITed AJAX search instead of
+    # rendering every candidate row as an <option>.
+    autocomplete_fields = ('role',)
 
 @admin.register(Role)
 class RoleAdmin(admin.ModelAdmin):
     """Admin configuration for the Role model."""
     list_display = ('name', 'description')
+    search_fields = ('name',)
 
 @admin.register(Permission)
 class PermissionAdmin(admin.ModelAdmin):
     """Admin configuration for the Permission model."""
     list_display = ('module', 'action', 'description')
     list_filter = ('module', 'action')
+    search_fields = ('module', 'action')
+    # Pin the ordering to the unique_together columns so the changelist
+    # never falls back to an implicit ORDER BY pk.
+    ordering = ('module', 'action')
 
 @admin.register(RolePermission)
 class RolePermissionAdmin(admin.ModelAdmin):
     """Admin configuration for the RolePermission model."""
     list_display = ('role', 'permission')
+    list_select_related = ('role', 'permission')
+    autocomplete_fields = ('role', 'permission')
 
 @admin.register(ActivityLog)
 class ActivityLogAdmin(admin.ModelAdmin):
     """Admin configuration for the ActivityLog model."""
     list_display = ('user', 'action', 'model_name', 'record_id', 'timestamp')
+    list_select_related = ('user',)
     list_filter = ('model_name', 'action')
-    search_fields = ('user__username', 'model_name')
+    autocomplete_fields = ('user',)
+    # Only timestamp is indexed for ordering; sorting by any other column
+    # would force a full-table sort, so don't offer it.
+    sortable_by = ('timestamp',)
+    ordering = ('-timestamp',)
+    paginator = TimeoutPaginator
+    # Skip the second unfiltered COUNT(*) the changelist runs for the
+    # "X total" label when filters are active.
+    show_full_result_count = False
+    # '=' makes the username lookup an exact match that the unique index
+    # can serve, instead of an ILIKE '%term%' scan per search.
+    search_fields = ('=user__username', 'model_name')
@@ -3,3 +3,14 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from auditlog.registry import auditlog
+        from .models import User, Role
+
+        # Register here rather than at model import time so the registry
+        # work happens once app loading is complete. last_login changes on
+        # every authentication and password is already hashed; excluding
+        # them stops a LogEntry INSERT per login.
+        auditlog.register(User, exclude_fields=['last_login', 'password'])
+        auditlog.register(Role)
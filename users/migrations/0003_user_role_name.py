@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-08-31 14:03
+
+from django.db import migrations, models
+
+
+def backfill_role_name(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Role = apps.get_model('users', 'Role')
+    for role in Role.objects.all():
+        User.objects.filter(role=role).update(role_name=role.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_activitylog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='role_name',
+            field=models.CharField(blank=True, choices=[('Admin', 'Admin'), ('Manager', 'Manager'), ('Operator', 'Operator')], db_index=True, default='', max_length=50),
+        ),
+        migrations.RunPython(backfill_role_name, migrations.RunPython.noop),
+    ]
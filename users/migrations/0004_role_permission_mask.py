@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-08-31 14:05
+
+from django.db import migrations, models
+
+# Mirrors PERMISSION_BIT in users/models.py; duplicated here so the
+# migration stays valid if the model-level mapping ever changes.
+MODULES = ['INVENTORY', 'INBOUND', 'OUTBOUND', 'USER']
+ACTIONS = ['CREATE', 'READ', 'UPDATE', 'DELETE']
+BIT = {
+    (module, action): 1 << (mi * len(ACTIONS) + ai)
+    for mi, module in enumerate(MODULES)
+    for ai, action in enumerate(ACTIONS)
+}
+
+
+def backfill_permission_masks(apps, schema_editor):
+    Role = apps.get_model('users', 'Role')
+    RolePermission = apps.get_model('users', 'RolePermission')
+    for role in Role.objects.all():
+        mask = 0
+        pairs = RolePermission.objects.filter(role=role).values_list(
+            'permission__module', 'permission__action'
+        )
+        for pair in pairs:
+            mask |= BIT.get(tuple(pair), 0)
+        Role.objects.filter(pk=role.pk).update(permission_mask=mask)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_role_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='role',
+            name='permission_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_permission_masks, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,18 @@
+from django.core.cache import cache
 from django.db import models
-from auditlog.registry import auditlog
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
 from django.contrib.auth.models import AbstractUser
 
+# Role -> permission mappings change rarely but are consulted on nearly
+# every authenticated request; the compiled bitmask lives in the cache
+# backend for an hour unless a RolePermission write invalidates it first.
+ROLE_PERMS_CACHE_TTL = 3600
+
+
+def role_perms_cache_key(role_id):
+    return f"role_perms:{role_id}"
+
 class Role(models.Model):
     """Represents a user role, such as Admin, Manager, or Operator."""
     ADMIN = 'Admin'
@@ -14,6 +25,9 @@ class Role(models.Model):
     ]
     name = models.CharField(max_length=50, choices=ROLE_CHOICES, unique=True)
     description = models.TextField(blank=True, null=True)
+    # Compiled view of this role's RolePermission rows: one bit per
+    # (module, action) pair, recomputed whenever the rows change.
+    permission_mask = models.BigIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -43,6 +57,17 @@ class Permission(models.Model):
     def __str__(self):
         return f"{self.get_action_display()} {self.get_module_display()}"
 
+
+# The (module, action) space is a small fixed cross-product, so every
+# pair maps to one bit and a role's whole permission set fits in
+# Role.permission_mask.
+PERMISSION_BIT = {
+    (module, action): 1 << (mi * len(Permission.ACTION_CHOICES) + ai)
+    for mi, (module, _) in enumerate(Permission.MODULE_CHOICES)
+    for ai, (action, _) in enumerate(Permission.ACTION_CHOICES)
+}
+
+
 class RolePermission(models.Model):
     """Links a Role to a specific Permission."""
     role = models.ForeignKey(Role, on_delete=models.CASCADE, related_name='permissions')
@@ -51,17 +76,84 @@ class RolePermission(models.Model):
     class Meta:
         unique_together = ('role', 'permission')
 
+
+def recompute_permission_mask(role_id):
+    """Rebuild and store the role's bitmask from its RolePermission rows."""
+    mask = 0
+    pairs = RolePermission.objects.filter(role_id=role_id).values_list(
+        'permission__module', 'permission__action'
+    )
+    for pair in pairs:
+        mask |= PERMISSION_BIT.get(tuple(pair), 0)
+    Role.objects.filter(pk=role_id).update(permission_mask=mask)
+    return mask
+
+
 class User(AbstractUser):
     """Custom user model that includes a role for permission handling."""
     role = models.ForeignKey(Role, on_delete=models.SET_NULL, null=True, blank=True)
-    
+    # Denormalized copy of role.name, kept in sync on save. Permission
+    # classes compare against it on every request, and reading it costs
+    # nothing because auth middleware already fetched the user row.
+    role_name = models.CharField(
+        max_length=50, choices=Role.ROLE_CHOICES, blank=True, default='', db_index=True
+    )
+
     def has_permission(self, module, action):
-        if not self.role:
+        if not self.role_id:
+            return False
+        bit = PERMISSION_BIT.get((module, action))
+        if bit is None:
             return False
-        return self.role.permissions.filter(
-            permission__module=module,
-            permission__action=action
-        ).exists()
+        # The check is a single bit test against the role's compiled mask.
+        # When the role row is already loaded (select_related) no query or
+        # cache hop happens at all; otherwise the instance memo and the
+        # shared cache keep the mask fetch off the per-check path.
+        mask = getattr(self, '_perm_mask', None)
+        if mask is None:
+            role = self._state.fields_cache.get('role')
+            if role is not None:
+                mask = role.permission_mask
+            else:
+                role_id = self.role_id
+                mask = cache.get_or_set(
+                    role_perms_cache_key(role_id),
+                    lambda: Role.objects.filter(pk=role_id).values_list(
+                        'permission_mask', flat=True
+                    ).first() or 0,
+                    ROLE_PERMS_CACHE_TTL,
+                )
+            self._perm_mask = mask
+        return bool(mask & bit)
+
+@receiver(pre_save, sender=User)
+def _sync_role_name(sender, instance, **kwargs):
+    """Keep the denormalized role_name column consistent with the FK."""
+    instance.role_name = instance.role.name if instance.role_id else ''
+
+
+@receiver(post_save, sender=Role)
+def _propagate_role_rename(sender, instance, **kwargs):
+    """Fix up denormalized names if a role is ever renamed (rare)."""
+    User.objects.filter(role=instance).exclude(role_name=instance.name).update(
+        role_name=instance.name
+    )
+
+
+@receiver(post_delete, sender=Role)
+def _clear_role_name(sender, instance, **kwargs):
+    """SET_NULL on the FK bypasses save(); clear the orphaned names too."""
+    User.objects.filter(role__isnull=True, role_name=instance.name).update(
+        role_name=''
+    )
+
+
+@receiver([post_save, post_delete], sender=RolePermission)
+def _invalidate_role_perms(sender, instance, **kwargs):
+    """Recompute the role's bitmask and drop its cached copy."""
+    recompute_permission_mask(instance.role_id)
+    cache.delete(role_perms_cache_key(instance.role_id))
+
 
 class ActivityLog(models.Model):
     """Logs user actions across the system for auditing purposes."""
@@ -72,9 +164,17 @@ class ActivityLog(models.Model):
     timestamp = models.DateTimeField(auto_now_add=True)
     details = models.JSONField(default=dict)
 
+    class Meta:
+        # The admin changelist orders by timestamp and filters on
+        # model_name/action or a user; indexed, those become range scans
+        # instead of full-table sorts as the log grows.
+        indexes = [
+            models.Index(fields=['-timestamp']),
+            models.Index(fields=['model_name', 'action']),
+            models.Index(fields=['user', '-timestamp']),
+        ]
+
     def __str__(self):
         return f"{self.user} {self.action} {self.model_name} ({self.record_id}) at {self.timestamp}"
 
-
-auditlog.register(User)
-auditlog.register(Role)
+# auditlog registration for User/Role lives in UsersConfig.ready().
@@ -1,16 +1,21 @@
 from rest_framework.permissions import BasePermission
 from .models import Role
 
+
 class IsAdminUser(BasePermission):
     """
     Allows access only to admin users.
     """
     def has_permission(self, request, view):
-                return bool(
-            request.user and
-            request.user.is_authenticated and
-            (request.user.is_superuser or (request.user.role and request.user.role.name == Role.ADMIN))
-        )
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        # Superusers pass unconditionally; skip the role check.
+        if user.is_superuser:
+            return True
+        # role_name is denormalized onto the user row, so this is a plain
+        # attribute read - no role JOIN or lookup per request.
+        return user.role_name == Role.ADMIN
 
 
 class IsAdminOrManagerUser(BasePermission):
@@ -18,11 +23,12 @@ class IsAdminOrManagerUser(BasePermission):
     Allows access only to admin or manager users.
     """
     def has_permission(self, request, view):
-        return bool(
-            request.user and
-            request.user.is_authenticated and
-            (request.user.is_superuser or (request.user.role and request.user.role.name in [Role.ADMIN, Role.MANAGER]))
-        )
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        if user.is_superuser:
+            return True
+        return user.role_name in [Role.ADMIN, Role.MANAGER]
 
 
 class AllowOperatorCreateOnly(BasePermission):
@@ -34,17 +40,18 @@ class AllowOperatorCreateOnly(BasePermission):
         # All authenticated users can list and retrieve
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
             return request.user and request.user.is_authenticated
-        
+
         # For create operations, allow all authenticated users
         if request.method == 'POST':
             return request.user and request.user.is_authenticated
-        
+
         # For update/delete operations, restrict to admin/manager
         if request.method in ['PUT', 'PATCH', 'DELETE']:
-            return bool(
-                request.user and
-                request.user.is_authenticated and
-                (request.user.is_superuser or (request.user.role and request.user.role.name in [Role.ADMIN, Role.MANAGER]))
-            )
-        
+            user = request.user
+            if not (user and user.is_authenticated):
+                return False
+            if user.is_superuser:
+                return True
+            return user.role_name in [Role.ADMIN, Role.MANAGER]
+
         return False
@@ -1,6 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from rest_framework import serializers
 from .models import User, Role, Permission
 
+# The Permission table is tiny and effectively static (a fixed module x
+# action cross-product), so keep its id set in process memory and refresh
+# it only when a Permission row actually changes. Loaded lazily on first
+# use rather than at app startup so management commands that run before
+# migrations never touch the table.
+_permission_ids = None
+
+
+def _known_permission_ids():
+    global _permission_ids
+    if _permission_ids is None:
+        _permission_ids = frozenset(Permission.objects.values_list('id', flat=True))
+    return _permission_ids
+
+
+@receiver([post_save, post_delete], sender=Permission)
+def _invalidate_permission_ids(sender, **kwargs):
+    global _permission_ids
+    _permission_ids = None
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """Serializer for user registration, including password confirmation."""
     password2 = serializers.CharField(style={'input_type': 'password'}, write_only=True)
@@ -12,18 +35,19 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             'password': {'write_only': True}
         }
 
-    def save(self):
-        user = User(
-            email=self.validated_data['email'],
-            username=self.validated_data['username']
-        )
-        password = self.validated_data['password']
-        password2 = self.validated_data['password2']
-        if password != password2:
+    def validate(self, attrs):
+        """Reject mismatched passwords during is_valid(), before any hashing."""
+        if attrs['password'] != attrs['password2']:
             raise serializers.ValidationError({'password': 'Passwords must match.'})
-        user.set_password(password)
-        user.save()
-        return user
+        return attrs
+
+    def save(self):
+        with transaction.atomic():
+            return User.objects.create_user(
+                username=self.validated_data['username'],
+                email=self.validated_data['email'],
+                password=self.validated_data['password'],
+            )
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -51,7 +75,13 @@ class RolePermissionSerializer(serializers.Serializer):
     def validate_permission_ids(self, value):
         """
         Check that all permission_ids exist.
+        Validating against the in-memory id set turns the per-request
+        existence query into a set difference; the error still names the
+        offending ids.
         """
-        if not Permission.objects.filter(id__in=value).count() == len(value):
-            raise serializers.ValidationError("One or more permissions do not exist.")
+        missing = set(value) - _known_permission_ids()
+        if missing:
+            raise serializers.ValidationError(
+                f"Permissions do not exist: {sorted(missing)}"
+            )
         return value
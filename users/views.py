@@ -3,8 +3,16 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from django.core.cache import cache
+from django.db import transaction
 from rest_framework.permissions import IsAuthenticated, BasePermission
-from .models import User, Role, Permission
+from .models import (
+    User,
+    Role,
+    RolePermission,
+    recompute_permission_mask,
+    role_perms_cache_key,
+)
 from .serializers import UserRegistrationSerializer, UserSerializer, RoleSerializer, RolePermissionSerializer
 from .permissions import IsAdminUser
 
@@ -28,18 +36,30 @@ class IsOwner(BasePermission):
 
 class UserViewSet(viewsets.ModelViewSet):
     """API endpoint for managing user accounts."""
-    queryset = User.objects.all()
+    # role is serialized per user and permission checks walk
+    # role -> permissions -> permission; loading them up front keeps list
+    # responses at a constant number of queries.
+    queryset = User.objects.select_related('role').prefetch_related(
+        'role__permissions__permission'
+    )
     serializer_class = UserSerializer
 
+    # Permission instances are stateless, so build them once at class
+    # scope instead of re-instantiating (and re-composing the OR holder)
+    # on every request.
+    _ME_PERMS = [IsAuthenticated()]
+    _OBJ_PERMS = [(IsAdminUser | IsOwner)()]
+    _DEFAULT_PERMS = [IsAdminUser()]
+    _ACTION_PERMS = {
+        'me': _ME_PERMS,
+        'retrieve': _OBJ_PERMS,
+        'update': _OBJ_PERMS,
+        'partial_update': _OBJ_PERMS,
+    }
+
     def get_permissions(self):
-        """Instantiates and returns the list of permissions that this view requires."""
-        if self.action == 'me':
-            permission_classes = [IsAuthenticated]
-        elif self.action in ['retrieve', 'update', 'partial_update']:
-            permission_classes = [IsAdminUser | IsOwner]
-        else:
-            permission_classes = [IsAdminUser]
-        return [permission() for permission in permission_classes]
+        """Returns the list of permissions that this view requires."""
+        return self._ACTION_PERMS.get(self.action, self._DEFAULT_PERMS)
 
     @action(detail=False, methods=['get'], url_path='me', url_name='user-me')
     def me(self, request):
@@ -50,7 +70,7 @@ class UserViewSet(viewsets.ModelViewSet):
 
 class RoleViewSet(viewsets.ModelViewSet):
     """API endpoint for managing user roles."""
-    queryset = Role.objects.all()
+    queryset = Role.objects.prefetch_related('permissions__permission')
     serializer_class = RoleSerializer
     permission_classes = [IsAdminUser]
 
@@ -67,8 +87,35 @@ class RolePermissionView(APIView):
 
         serializer = RolePermissionSerializer(data=request.data)
         if serializer.is_valid():
-            permission_ids = serializer.validated_data['permission_ids']
-            permissions = Permission.objects.filter(id__in=permission_ids)
-            role.permissions.set(permissions)
+            desired = set(serializer.validated_data['permission_ids'])
+            # The validator already proved the ids exist, so diff the
+            # through table against the submitted set and only touch the
+            # rows that actually change - re-submitting the same
+            # assignment is then a pure read.
+            with transaction.atomic():
+                current = set(
+                    RolePermission.objects.filter(role=role).values_list(
+                        'permission_id', flat=True
+                    )
+                )
+                to_remove = current - desired
+                to_add = desired - current
+                if to_remove:
+                    RolePermission.objects.filter(
+                        role=role, permission_id__in=to_remove
+                    ).delete()
+                if to_add:
+                    RolePermission.objects.bulk_create(
+                        [
+                            RolePermission(role=role, permission_id=pid)
+                            for pid in to_add
+                        ],
+                        ignore_conflicts=True,
+                    )
+            if to_remove or to_add:
+                # bulk_create skips post_save signals; rebuild the mask
+                # and invalidate the cached copy by hand.
+                recompute_permission_mask(role.id)
+                cache.delete(role_perms_cache_key(role.id))
             return Response({"message": f"Permissions for role '{role.name}' updated successfully."})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)